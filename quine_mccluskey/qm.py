@@ -39,9 +39,9 @@ terms of complexity of the output.
 """
 
 from __future__ import print_function
-import math
+import collections
+import heapq
 import itertools
-import re
 
 
 class QuineMcCluskey:
@@ -66,21 +66,20 @@ class QuineMcCluskey:
         """
         self.use_xor = use_xor  # Whether or not to use XOR and XNOR operations.
         self.n_bits = 0         # number of bits (i.e. self.n_bits == len(ones[i]) for every i).
+        self.reset_profile()
 
 
 
-    def __num2str(self, i):
-        """
-        Convert an integer to its bit-representation in a string.
-
-        Args:
-            i (int): the number to convert.
+    def reset_profile(self):
+        """Reset the profiling counters.
 
-        Returns:
-            The binary string representation of the parameter i.
+        This is done at the start of every simplification, so that an
+        instance can be reused and the counters always refer to the last
+        call.
         """
-        x = ['1' if i & (1 << k) else '0' for k in range(self.n_bits - 1, -1, -1)]
-        return "".join(x)
+        self.profile_cmp = 0    # number of comparisons (for profiling)
+        self.profile_xor = 0    # number of comparisons (for profiling)
+        self.profile_xnor = 0   # number of comparisons (for profiling)
 
 
 
@@ -117,15 +116,17 @@ class QuineMcCluskey:
             return None
 
         # Calculate the number of bits to use
-        # Needed internally by __num2str()
         if num_bits is not None:
             self.n_bits = num_bits
         else:
-            self.n_bits = int(math.ceil(math.log(max(terms) + 1, 2)))
+            self.n_bits = max(1, max(terms).bit_length())
 
-        # Generate the sets of ones and dontcares
-        ones = [self.__num2str(i) for i in ones]
-        dc = [self.__num2str(i) for i in dc]
+        # Generate the sets of ones and dontcares.
+        # Any bits above n_bits are masked off, format() would keep them.
+        fmt = '0%db' % self.n_bits
+        mask = (1 << self.n_bits) - 1
+        ones = [format(i & mask, fmt) for i in ones]
+        dc = [format(i & mask, fmt) for i in dc]
 
         return self.simplify_los(ones, dc)
 
@@ -170,9 +171,7 @@ class QuineMcCluskey:
             This will produce the ouput: ['--^^'].
             In other words, x = b1 ^ b0, (bit1 XOR bit0).
         """
-        self.profile_cmp = 0    # number of comparisons (for profiling)
-        self.profile_xor = 0    # number of comparisons (for profiling)
-        self.profile_xnor = 0   # number of comparisons (for profiling)
+        self.reset_profile()
 
         terms = set(ones) | set(dc)
         if len(terms) == 0:
@@ -189,76 +188,19 @@ class QuineMcCluskey:
         # First step of Quine-McCluskey method.
         prime_implicants = self.__get_prime_implicants(terms)
 
+        # The dontcares are only needed as integers from here on.
+        dc = frozenset(int(d, 2) for d in dc)
+
         # Remove essential terms.
-        essential_implicants = self.__get_essential_implicants(prime_implicants, set(dc))
+        essential_implicants = self.__get_essential_implicants(prime_implicants, dc)
 
         # Perform further reduction on essential implicants
-        reduced_implicants = self.__reduce_implicants(essential_implicants, set(dc))
+        reduced_implicants = self.__reduce_implicants(essential_implicants, dc)
 
         return reduced_implicants
 
 
 
-    def __reduce_simple_xor_terms(self, t1, t2):
-        """Try to reduce two terms t1 and t2, by combining them as XOR terms.
-
-        Args:
-            t1 (str): a term.
-            t2 (str): a term.
-
-        Returns:
-            The reduced term or None if the terms cannot be reduced.
-        """
-        difft10 = 0
-        difft20 = 0
-        ret = []
-        for (t1c, t2c) in zip(t1, t2):
-            if t1c == '^' or t2c == '^' or t1c == '~' or t2c == '~':
-                return None
-            elif t1c != t2c:
-                ret.append('^')
-                if t2c == '0':
-                    difft10 += 1
-                else:
-                    difft20 += 1
-            else:
-                ret.append(t1c)
-        if difft10 == 1 and difft20 == 1:
-            return "".join(ret)
-        return None
-
-
-
-    def __reduce_simple_xnor_terms(self, t1, t2):
-        """Try to reduce two terms t1 and t2, by combining them as XNOR terms.
-
-        Args:
-            t1 (str): a term.
-            t2 (str): a term.
-
-        Returns:
-            The reduced term or None if the terms cannot be reduced.
-        """
-        difft10 = 0
-        difft20 = 0
-        ret = []
-        for (t1c, t2c) in zip(t1, t2):
-            if t1c == '^' or t2c == '^' or t1c == '~' or t2c == '~':
-                return None
-            elif t1c != t2c:
-                ret.append('~')
-                if t1c == '0':
-                    difft10 += 1
-                else:
-                    difft20 += 1
-            else:
-                ret.append(t1c)
-        if (difft10 == 2 and difft20 == 0) or (difft10 == 0 and difft20 == 2):
-            return "".join(ret)
-        return None
-
-
-
     def __get_prime_implicants(self, terms):
         """Simplify the set 'terms'.
 
@@ -274,62 +216,98 @@ class QuineMcCluskey:
         generates all prime implicants, whether they are redundant or not.
         """
 
-        # Sort and remove duplicates.
-        n_groups = self.n_bits + 1
         marked = set()
 
-        # Group terms into the list groups.
-        # groups is a list of length n_groups.
-        # Each element of groups is a set of terms with the same number
-        # of ones.  In other words, each term contained in the set
-        # groups[i] contains exactly i ones.
-        groups = [set() for i in range(n_groups)]
+        # From here on the terms are handled in their packed integer form,
+        # see __term2packed().
+        n_bits = self.n_bits
+        mask = (1 << n_bits) - 1
+        xor_shift = 2 * n_bits      # position of the '^' field
+        xnor_shift = 3 * n_bits     # position of the '~' field
+
+        # Group terms into groups.
+        # groups is a dict of sets of terms.  The key of a group packs the
+        # number of '1', '^' and '~' in each of its terms into one integer
+        # with fields of key_bits bits: (n_ones, n_xor, n_xnor), from the
+        # most significant field down.  Integer keys hash faster than tuples.
+        # The bits of each term are counted only here, the keys of all
+        # terms derived from it follow from its key.
+        key_bits = (n_bits + 1).bit_length()
+        key_mask = (1 << key_bits) - 1
+        key_one = 1 << (2 * key_bits)   # key increment for one more '1'
+        key_xor = 1 << key_bits         # key increment for one more '^'
+        key_xnor = 1                    # key increment for one more '~'
+        groups = dict()
         for t in terms:
-            n_bits = t.count('1')
-            groups[n_bits].add(t)
+            t = self.__term2packed(t)
+            n_ones = bin(t & mask).count('1')
+            n_xor  = bin((t >> xor_shift) & mask).count('1')
+            n_xnor = bin(t >> xnor_shift).count('1')
+            # The algorithm can not cope with mixed XORs and XNORs in
+            # one expression.
+            assert n_xor == 0 or n_xnor == 0
+
+            key = n_ones * key_one + n_xor * key_xor + n_xnor * key_xnor
+            groups.setdefault(key, set()).add(t)
+
         if self.use_xor:
             # Add 'simple' XOR and XNOR terms to the set of terms.
             # Simple means the terms can be obtained by combining just two
             # bits.
-            for gi, group in enumerate(groups):
+            # As in the main loop below, instead of comparing t1 with every
+            # other term, construct the terms t1 can be combined with and
+            # check if they are contained in the group.
+            xor_groups = dict()
+            for key, group in groups.items():
+                if key % key_one:
+                    # Only plain minterms are combined here.
+                    continue
+                group_xnor = groups.get(key + 2 * key_one, ())
                 for t1 in group:
-                    for t2 in group:
-                        t12 = self.__reduce_simple_xor_terms(t1, t2)
-                        if t12 != None:
-                            terms.add(t12)
-                    if gi < n_groups - 2:
-                        for t2 in groups[gi + 2]:
-                            t12 = self.__reduce_simple_xnor_terms(t1, t2)
-                            if t12 != None:
-                                terms.add(t12)
+                    ones = t1 & mask
+                    zeros = (t1 >> n_bits) & mask
+                    z_rest = zeros
+                    while z_rest:
+                        z = z_rest & -z_rest
+                        z_rest ^= z
+                        # XOR: swap a '1' at a lower position with the '0'
+                        # at position z.  t2 is in the same group.
+                        o_rest = ones & (z - 1)
+                        while o_rest:
+                            o = o_rest & -o_rest
+                            o_rest ^= o
+                            diff = z | o
+                            both = diff | (diff << n_bits)
+                            if (t1 ^ both) in group:
+                                key_new = key - key_one + 2 * key_xor
+                                t12 = (t1 & ~both) | (diff << xor_shift)
+                                xor_groups.setdefault(key_new, set()).add(t12)
+                        # XNOR: set the '0' at position z and a '0' at a
+                        # higher position.  t2 is two groups further up.
+                        z2_rest = z_rest if group_xnor else 0
+                        while z2_rest:
+                            z2 = z2_rest & -z2_rest
+                            z2_rest ^= z2
+                            diff = z | z2
+                            both = diff | (diff << n_bits)
+                            if (t1 ^ both) in group_xnor:
+                                key_new = key + 2 * key_xnor
+                                t12 = (t1 & ~both) | (diff << xnor_shift)
+                                xor_groups.setdefault(key_new, set()).add(t12)
+            for key, group in xor_groups.items():
+                groups.setdefault(key, set()).update(group)
 
         done = False
         while not done:
-            # Group terms into groups.
-            # groups is a list of length n_groups.
-            # Each element of groups is a set of terms with the same
-            # number of ones.  In other words, each term contained in the
-            # set groups[i] contains exactly i ones.
-            groups = dict()
-            for t in terms:
-                n_ones = t.count('1')
-                n_xor  = t.count('^')
-                n_xnor = t.count('~')
-                # The algorithm can not cope with mixed XORs and XNORs in
-                # one expression.
-                assert n_xor == 0 or n_xnor == 0
-
-                key = (n_ones, n_xor, n_xnor)
-                if key not in groups:
-                    groups[key] = set()
-                groups[key].add(t)
-
-            terms = set()           # The set of new created terms
+            # The new terms are grouped as they are created: their key
+            # follows from the key of t1, so there is no need to count the
+            # bits of each term again.
+            new_groups = dict()     # The groups of new created terms
             used = set()            # The set of used terms
 
             # Find prime implicants
             for key in groups:
-                key_next = (key[0]+1, key[1], key[2])
+                key_next = key + key_one
                 if key_next in groups:
                     group_next = groups[key_next]
                     for t1 in groups[key]:
@@ -340,44 +318,66 @@ class QuineMcCluskey:
                         # possible permutations of t1 by adding a '1' in
                         # opportune positions and check if this new term is
                         # contained in the set groups[key_next].
-                        for i, c1 in enumerate(t1):
-                            if c1 == '0':
-                                self.profile_cmp += 1
-                                t2 = t1[:i] + '1' + t1[i+1:]
-                                if t2 in group_next:
-                                    t12 = t1[:i] + '-' + t1[i+1:]
-                                    used.add(t1)
-                                    used.add(t2)
-                                    terms.add(t12)
+                        zeros = (t1 >> n_bits) & mask
+                        while zeros:
+                            bit = zeros & -zeros
+                            zeros ^= bit
+                            self.profile_cmp += 1
+                            t12 = t1 ^ (bit << n_bits)
+                            t2 = t12 | bit
+                            if t2 in group_next:
+                                used.add(t1)
+                                used.add(t2)
+                                new_groups.setdefault(key, set()).add(t12)
 
             # Find XOR combinations
-            for key in [k for k in groups if k[1] > 0]:
-                key_complement = (key[0] + 1, key[2], key[1])
+            for key in [k for k in groups if (k >> key_bits) & key_mask]:
+                # One more '1', and the '^' count becomes the '~' count.
+                n_xor = (key >> key_bits) & key_mask
+                key_complement = key + key_one - n_xor * key_xor + n_xor * key_xnor
+                key_new = key + key_xor
                 if key_complement in groups:
+                    group_complement = groups[key_complement]
                     for t1 in groups[key]:
-                        t1_complement = t1.replace('^', '~')
-                        for i, c1 in enumerate(t1):
-                            if c1 == '0':
-                                self.profile_xor += 1
-                                t2 = t1_complement[:i] + '1' + t1_complement[i+1:]
-                                if t2 in groups[key_complement]:
-                                    t12 = t1[:i] + '^' + t1[i+1:]
-                                    used.add(t1)
-                                    terms.add(t12)
+                        zeros = (t1 >> n_bits) & mask
+                        if not zeros:
+                            continue
+                        # Move the XOR bits into the XNOR field.
+                        xors = t1 >> xor_shift
+                        t1_complement = t1 + (xors << xnor_shift) - (xors << xor_shift)
+                        while zeros:
+                            bit = zeros & -zeros
+                            zeros ^= bit
+                            self.profile_xor += 1
+                            zero_bit = bit << n_bits
+                            if (t1_complement ^ zero_bit ^ bit) in group_complement:
+                                t12 = t1 ^ zero_bit ^ (bit << xor_shift)
+                                used.add(t1)
+                                new_groups.setdefault(key_new, set()).add(t12)
             # Find XNOR combinations
-            for key in [k for k in groups if k[2] > 0]:
-                key_complement = (key[0] + 1, key[2], key[1])
+            for key in [k for k in groups if k & key_mask]:
+                # One more '1', and the '~' count becomes the '^' count.
+                n_xnor = key & key_mask
+                key_complement = key + key_one - n_xnor * key_xnor + n_xnor * key_xor
+                key_new = key + key_xnor
                 if key_complement in groups:
+                    group_complement = groups[key_complement]
                     for t1 in groups[key]:
-                        t1_complement = t1.replace('~', '^')
-                        for i, c1 in enumerate(t1):
-                            if c1 == '0':
-                                self.profile_xnor += 1
-                                t2 = t1_complement[:i] + '1' + t1_complement[i+1:]
-                                if t2 in groups[key_complement]:
-                                    t12 = t1[:i] + '~' + t1[i+1:]
-                                    used.add(t1)
-                                    terms.add(t12)
+                        zeros = (t1 >> n_bits) & mask
+                        if not zeros:
+                            continue
+                        # Move the XNOR bits into the XOR field.
+                        xnors = t1 >> xnor_shift
+                        t1_complement = t1 + (xnors << xor_shift) - (xnors << xnor_shift)
+                        while zeros:
+                            bit = zeros & -zeros
+                            zeros ^= bit
+                            self.profile_xnor += 1
+                            zero_bit = bit << n_bits
+                            if (t1_complement ^ zero_bit ^ bit) in group_complement:
+                                t12 = t1 ^ zero_bit ^ (bit << xnor_shift)
+                                used.add(t1)
+                                new_groups.setdefault(key_new, set()).add(t12)
 
             # Add the unused terms to the list of marked terms
             for g in list(groups.values()):
@@ -385,12 +385,81 @@ class QuineMcCluskey:
 
             if len(used) == 0:
                 done = True
+            else:
+                groups = new_groups
 
         # Prepare the list of prime implicants
         pi = marked
         for g in list(groups.values()):
             pi |= g
-        return pi
+        return set(self.__packed2term(t) for t in pi)
+
+
+
+    def __term2packed(self, term):
+        """Pack a term string into an integer.
+
+        Args:
+            term (str): a term containing the characters '0', '1', '-', '^'
+            and '~'.
+
+        Returns:
+            An integer made of four bit fields of self.n_bits bits each. From
+            the least significant field upwards the fields hold the positions
+            of the '1', '0', '^' and '~' characters in the term; a '-' is not
+            represented in any field.  Bit k of each field stands for the
+            character at position self.n_bits - 1 - k of the term.
+
+        Example:
+            With self.n_bits == 4, the term '1-0^' is packed to
+            0b0000000100101000 (fields: '~' 0000, '^' 0001, '0' 0010,
+            '1' 1000).
+
+        Terms in packed form are cheaper to hash and compare than strings,
+        and combining two terms becomes a matter of a few bit operations.
+        """
+        if term and not term.strip('01'):
+            # A minterm: let int() do the work.
+            ones = int(term, 2)
+            return ones | ((ones ^ ((1 << self.n_bits) - 1)) << self.n_bits)
+        packed = 0
+        for c in term:
+            packed <<= 1
+            if c == '1':
+                packed |= 1
+            elif c == '0':
+                packed |= 1 << self.n_bits
+            elif c == '^':
+                packed |= 1 << (2 * self.n_bits)
+            elif c == '~':
+                packed |= 1 << (3 * self.n_bits)
+        return packed
+
+
+
+    def __packed2term(self, packed):
+        """Convert a packed term back to its string representation.
+
+        Args:
+            packed (int): a term as returned by __term2packed.
+
+        Returns:
+            The term as a string.
+        """
+        ret = []
+        for k in range(self.n_bits - 1, -1, -1):
+            bit = 1 << k
+            if packed & bit:
+                ret.append('1')
+            elif packed & (bit << self.n_bits):
+                ret.append('0')
+            elif packed & (bit << (2 * self.n_bits)):
+                ret.append('^')
+            elif packed & (bit << (3 * self.n_bits)):
+                ret.append('~')
+            else:
+                ret.append('-')
+        return "".join(ret)
 
 
 
@@ -400,7 +469,7 @@ class QuineMcCluskey:
         Args:
             terms (set of str): set of strings representing the minterms of
             ones and dontcares.
-            dc (set of str): set of strings representing the dontcares.
+            dc (set of int): set of integers representing the dontcares.
 
         Returns:
             A list of prime implicants. These are the minterms that cannot be
@@ -414,9 +483,7 @@ class QuineMcCluskey:
         """
 
         # Create all permutations for each term in terms.
-        perms = {}
-        for t in terms:
-            perms[t] = set(p for p in self.permutations(t) if p not in dc)
+        perms = {t: self.__permutations_int(t, exclude=dc) for t in terms}
 
         # Now group the remaining terms and see if any term can be covered
         # by a combination of terms.
@@ -425,14 +492,27 @@ class QuineMcCluskey:
         groups = dict()
         for t in terms:
             n = self.__get_term_rank(t, len(perms[t]))
-            if n not in groups:
-                groups[n] = set()
-            groups[n].add(t)
-        for t in sorted(list(groups.keys()), reverse=True):
-            for g in groups[t]:
-                if not perms[g] <= ei_range:
-                    ei.add(g)
-                    ei_range |= perms[g]
+            groups.setdefault(n, []).append(t)
+        for n in sorted(groups, reverse=True):
+            # Among terms of the same rank, prefer the one adding the most
+            # new values, then the least complex one, then the smallest
+            # string, so that the result does not depend on set order.
+            # The gain of a term can only shrink, so a stale entry in the
+            # heap is updated and pushed back when it comes to the top.
+            heap = [(-len(perms[t] - ei_range), self.__complexity(t), t) for t in groups[n]]
+            heapq.heapify(heap)
+            while heap:
+                neg_gain, cx, g = heapq.heappop(heap)
+                gain = len(perms[g] - ei_range)
+                if gain == 0:
+                    if neg_gain == 0:
+                        break
+                    continue
+                if gain != -neg_gain:
+                    heapq.heappush(heap, (-gain, cx, g))
+                    continue
+                ei.add(g)
+                ei_range |= perms[g]
         if len(ei) == 0:
             ei = set(['-' * self.n_bits])
         return ei
@@ -474,20 +554,31 @@ class QuineMcCluskey:
 
 
 
-    def permutations(self, value = '', exclude={}):
+    def __complexity(self, term):
+        """Return the complexity of a term; simpler terms score lower."""
+        ret = 0
+        ret += 1.00 * term.count('1')
+        ret += 1.50 * term.count('0')
+        ret += 1.25 * term.count('^')
+        ret += 1.75 * term.count('~')
+        return ret
+
+
+
+    @staticmethod
+    def permutations(value = '', exclude=frozenset()):
         """Iterator to generate all possible values out of a string.
 
         Args:
             value (str): A string containing any of the above characters.
-            exclude (set): A set of values to skip (usually don't cares)
+            exclude (set of int): A set of values to skip (usually don't cares)
 
         Returns:
             The output strings contain only '0' and '1'.
 
         Example:
             from qm import QuineMcCluskey
-            qm = QuineMcCluskey()
-            for i in qm.permutations('1--^^'):
+            for i in QuineMcCluskey.permutations('1--^^'):
                 print(i)
 
         The operation performed by this generator function can be seen as the
@@ -582,74 +673,135 @@ class QuineMcCluskey:
 
 
 
+    def __permutations_int(self, value, exclude=frozenset()):
+        """Generate all possible values out of a string, as integers.
+
+        Args:
+            value (str): A string containing the characters '0', '1', '-',
+            '^' and '~'.
+            exclude (set of int): A set of values to skip (usually don't
+            cares).
+
+        Returns:
+            A frozenset of integers.  This is the same set of values as
+            generated by permutations(), but without going through strings.
+
+        The fixed bits of the term give a base value.  All subsets of the
+        '-', '^' and '~' positions are added to it, except for the rightmost
+        '^' or '~' position, which is set or cleared to give the XOR-ed bits
+        the right parity: odd if that last operator is a '^', even if it is
+        a '~'.
+        """
+        base = 0
+        free = 0
+        ops = 0
+        parity = 0
+        for c in value:
+            base <<= 1
+            free <<= 1
+            ops <<= 1
+            if c == '1':
+                base |= 1
+            elif c == '-':
+                free |= 1
+            elif c == '^' or c == '~':
+                ops |= 1
+                parity = 1 if c == '^' else 0
+        last_op = ops & -ops
+        free |= ops ^ last_op
+
+        res = set()
+        sub = 0
+        while True:
+            v = base | sub
+            if ops and bin(sub & ops).count('1') & 1 != parity:
+                v |= last_op
+            if v not in exclude:
+                res.add(v)
+            # Next subset of the free bits.
+            sub = (sub - free) & free
+            if sub == 0:
+                break
+        return frozenset(res)
+
+
+
     def __reduce_implicants(self, implicants, dc):
         def get_terms(implicant):
             """Return the indexes for each type of token in given implicant string"""
-            term_ones = [m.start() for m in re.finditer(re.escape('1'), implicant)]
-            term_zeros = [m.start() for m in re.finditer(re.escape('0'), implicant)]
-            term_xors = [m.start() for m in re.finditer(re.escape('^'), implicant)]
-            term_xnors = [m.start() for m in re.finditer(re.escape('~'), implicant)]
-            term_dcs = [m.start() for m in re.finditer(re.escape('-'), implicant)]
+            term_ones, term_zeros, term_xors, term_xnors, term_dcs = [], [], [], [], []
+            tokens = {'1': term_ones, '0': term_zeros, '^': term_xors, '~': term_xnors, '-': term_dcs}
+            for i, c in enumerate(implicant):
+                tokens[c].append(i)
             return term_ones, term_zeros, term_xors, term_xnors, term_dcs
 
-        def complexity(implicant):    # Stub
-            ret = 0
-            term_ones, term_zeros, term_xors, term_xnors, _ = get_terms(implicant)
-            ret += 1.00 * len(term_ones)
-            ret += 1.50 * len(term_zeros)
-            ret += 1.25 * len(term_xors)
-            ret += 1.75 * len(term_xnors)
-            return ret
+        complexity = self.__complexity
+
+        perms_cache = {}
+
+        def get_permutations(implicant):
+            """Return the permutations of an implicant, computing them only once"""
+            if implicant not in perms_cache:
+                perms_cache[implicant] = self.__permutations_int(implicant, exclude=dc)
+            return perms_cache[implicant]
+
+        def may_cover(implicant, n):
+            """Check if the implicant can have exactly n permutations, without generating them"""
+            n_xors = implicant.count('^') + implicant.count('~')
+            n_max = 2 ** (implicant.count('-') + max(n_xors - 1, 0))
+            return n_max - len(dc) <= n <= n_max
 
         def combine_implicants(a, b):
-            permutations_a = set(self.permutations(a, exclude=dc))
-            permutations_b = set(self.permutations(b, exclude=dc))
+            permutations_ab = get_permutations(a) | get_permutations(b)
             _, _, _, _, a_term_dcs = get_terms(a)
             _, _, _, _, b_term_dcs = get_terms(b)
             a_potential, b_potential = list(a), list(b)
             for index in a_term_dcs: a_potential[index] = b[index]
             for index in b_term_dcs: b_potential[index] = a[index]
+            # A term can not mix XOR and XNOR operators.
             valid = [
                 x for x in [''.join(a_potential), ''.join(b_potential)]
-                if self.permutations(x, exclude=dc) == (permutations_a | permutations_b)
+                if not ('^' in x and '~' in x)
+                and may_cover(x, len(permutations_ab)) and get_permutations(x) == permutations_ab
             ]
-            if valid: return sorted(valid, key=complexity)[0]
+            if valid: return min(valid, key=complexity)
             return None
 
-        # Combine implicants in orthogonal spaces
-        while True:
-            for a, b in itertools.combinations(implicants, 2):
-                replacement = combine_implicants(a, b)
-                if replacement:
-                    implicants.remove(a)
-                    implicants.remove(b)
-                    implicants |= {replacement}
-                    break
-            else:
-                break
+        # Combine implicants in orthogonal spaces.
+        # A pair of implicants which can not be combined will not become
+        # combinable later on, so after a merge only the pairs with the new
+        # implicant need to be tried.
+        pairs = collections.deque(itertools.combinations(sorted(implicants), 2))
+        while pairs:
+            a, b = pairs.popleft()
+            if a not in implicants or b not in implicants:
+                continue
+            replacement = combine_implicants(a, b)
+            if replacement:
+                implicants.difference_update((a, b))
+                pairs.extend((replacement, x) for x in sorted(implicants) if x != replacement)
+                implicants.add(replacement)
 
         # Reduce redundant implicants further by comparing their coverage
         coverage = {
-            implicant: {n for n in self.permutations(implicant) if n not in dc}
-            for implicant in implicants
+            implicant: get_permutations(implicant)
+            for implicant in sorted(implicants)
         }
 
+        # An implicant is redundant if every value it covers is also covered
+        # by at least one other implicant.
+        cover_count = collections.Counter()
+        for this_coverage in coverage.values():
+            cover_count.update(this_coverage)
+
         while True:
-            redundant = []
-            for this_implicant in list(coverage):
-                this_coverage = coverage[this_implicant]
-                others_coverage = {
-                    n
-                    for other_implicant in [
-                        implicant for implicant in coverage.keys()
-                        if implicant != this_implicant
-                    ]
-                    for n in coverage[other_implicant]
-                }
-                if this_coverage.issubset(others_coverage): redundant.append(this_implicant)
+            redundant = [
+                this_implicant for this_implicant, this_coverage in coverage.items()
+                if all(cover_count[n] > 1 for n in this_coverage)
+            ]
             if redundant:
-                worst = sorted(redundant, key=complexity, reverse=True)[0]
-                del coverage[worst]
+                worst = max(sorted(redundant), key=complexity)
+                cover_count.subtract(coverage.pop(worst))
             else:
                 break
         if not coverage: coverage = {'-'*self.n_bits: {}}
@@ -1,9 +1,12 @@
 #!/usr/bin/env python
 
 from __future__ import print_function
+import argparse
+import collections
+import itertools
 import os
 import sys
-import time
+from timeit import default_timer as timer
 from quine_mccluskey.qm import QuineMcCluskey
 
 class TestFailure(Exception): pass
@@ -14,12 +17,9 @@ def generate_input(s_terms):
     """
     generate input for a desired result
     """
-    qm = QuineMcCluskey()
     res = set()
-    if len(s_terms) == 0:
-        return res
     for term in s_terms:
-        res = res | set([i for i in qm.permutations(term)])
+        res.update(QuineMcCluskey.permutations(term))
     return res
 
 
@@ -32,8 +32,7 @@ def format_set(s):
     max_el = 50
     if not s:
         return ""
-    l = list(s)
-    ret = "'" + "', '".join(l[:min(max_el, len(s))]) + "'"
+    ret = "'" + "', '".join(itertools.islice(s, max_el)) + "'"
     if len(s) > max_el:
         ret = ret + ", ..."
     return ret
@@ -41,46 +40,39 @@ def format_set(s):
 
 # run function
 ###############################################################################
-def run(test_vector, use_xor):
+def run(test_vector, use_xor, verbose=True):
     """
     Run function
+
+    Unless verbose is set, only failing tests are printed.
     """
     qm = QuineMcCluskey(use_xor = use_xor)
 
     for test in test_vector:
-        s_out = test['res']
-        if 'ons' in test or 'dnc' in test:
-            if 'ons' in test:
-                ones = test['ons']
-            else:
-                ones = []
-
-            if 'dnc' in test:
-                dontcares = test['dnc']
-            else:
-                dontcares = []
-            pretty_ones = "%s" % ones
-            pretty_dontcares = "%s" % dontcares
-
-            t1 = time.time()
+        s_out = test.res
+        if test.ons is not None or test.dnc is not None:
+            ones = test.ons or []
+            dontcares = test.dnc or []
+            pretty = lambda terms: "%s" % terms
+
+            t1 = timer()
             s_res = qm.simplify(ones, dontcares)
-            t2 = time.time()
+            t2 = timer()
         else:
-            s_ones = generate_input(s_out)
-            s_dontcares = set()
-            pretty_ones = "[%s]" % format_set(s_ones)
-            pretty_dontcares = "[%s]" % format_set(s_dontcares)
+            ones = generate_input(s_out)
+            dontcares = set()
+            pretty = lambda terms: "[%s]" % format_set(terms)
 
-            t1 = time.time()
-            s_res = qm.simplify_los(s_ones, s_dontcares)
-            t2 = time.time()
+            t1 = timer()
+            s_res = qm.simplify_los(ones, dontcares)
+            t2 = timer()
 
-
-        print()
-        print("ones:        %s" % pretty_ones)
-        print("dontcares:   %s" % pretty_dontcares)
-        print("res:         [%s]" % format_set(s_res))
-        print('time:        %0.3f ms, %d comparisons, %d XOR and %d XNOR comparisons' % ((t2-t1)*1000.0, qm.profile_cmp, qm.profile_xor, qm.profile_xnor))
+        if verbose or s_res != s_out:
+            print()
+            print("ones:        %s" % pretty(ones))
+            print("dontcares:   %s" % pretty(dontcares))
+            print("res:         [%s]" % format_set(s_res))
+            print('time:        %0.3f ms, %d comparisons, %d XOR and %d XNOR comparisons' % ((t2-t1)*1000.0, qm.profile_cmp, qm.profile_xor, qm.profile_xnor))
         if s_res != s_out:
             print("Error: test failed")
             print("expected:    [%s]" % format_set(s_out))
@@ -88,39 +80,109 @@ def run(test_vector, use_xor):
             raise TestFailure
     print("\nTest OK.")
 
+
+# permutations test
+###############################################################################
+def run_permutations():
+    """
+    Check that the integer permutations match permutations()
+
+    Every term of up to four characters is expanded, with and without
+    excluding some values.
+    """
+    qm = QuineMcCluskey()
+    for n_bits in range(1, 5):
+        for chars in itertools.product('01-^~', repeat=n_bits):
+            term = ''.join(chars)
+            for exclude in (frozenset(), frozenset([0, 3, 5])):
+                expected = set(int(i, 2) for i in QuineMcCluskey.permutations(term, exclude=exclude))
+                got = qm._QuineMcCluskey__permutations_int(term, exclude=exclude)
+                if got != expected:
+                    print("Error: permutations of '%s' differ" % term)
+                    print("expected:    %s" % sorted(expected))
+                    print("got:         %s" % sorted(got))
+                    raise TestFailure
+
+
+# reset_profile test
+###############################################################################
+def run_reset_profile():
+    """
+    Check that reset_profile clears the comparison counters
+    """
+    qm = QuineMcCluskey(use_xor = True)
+    counters = lambda: (qm.profile_cmp, qm.profile_xor, qm.profile_xnor)
+
+    if counters() != (0, 0, 0):
+        print("Error: profile counters not zero on a new instance: %s" % (counters(), ))
+        raise TestFailure
+    qm.simplify([1, 2, 5, 6, 9, 10, 13, 14])
+    if 0 in counters():
+        print("Error: profile counters not updated by simplify: %s" % (counters(), ))
+        raise TestFailure
+    qm.reset_profile()
+    if counters() != (0, 0, 0):
+        print("Error: profile counters not zero after reset_profile: %s" % (counters(), ))
+        raise TestFailure
+
+# test vectors
+###############################################################################
+# A test case gives the expected result res and the ones and dontcares of
+# the input.  If neither ons nor dnc is given, the ones are generated from
+# the expected result.
+Case = collections.namedtuple('Case', ['res', 'ons', 'dnc'])
+Case.__new__.__defaults__ = (None, None)
+
+# The test vectors are built once, when the module is loaded.
+common_test_vector = (
+    Case(frozenset(['----']), ons=[], dnc=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]),
+    Case(frozenset(['----']), ons=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]),
+    Case(frozenset(['----']), ons=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9], dnc=[10, 11, 12, 13, 14, 15]),
+    Case(frozenset(['----']), ons=[1, 3, 5, 7, 9, 11, 13, 15], dnc=[0, 2, 4, 6, 8, 10, 12, 14]),
+    Case(frozenset(['0']), ons=[0]),
+    Case(frozenset(['00-']), ons=[0, 1], dnc=[2, 4, 6]),
+)
+noxor_test_vector = (
+    Case(frozenset(['010-', '1-01', '111-', '0-11']), ons=[3,4,5,7,9,13,14,15]),
+)
+xor_test_vector = (
+    Case(frozenset(['--^^'])),
+    Case(frozenset(['1--^^'])),
+    Case(frozenset(['-10']), ons=[2], dnc=[4, 5, 6, 7]),
+    Case(frozenset(['--1--11-', '00000001', '10001000'])),
+    Case(frozenset(['--^^']), ons=[1, 2, 5, 6, 9, 10, 13, 14]),
+    Case(frozenset(['^^^^']), ons=[1, 7, 8, 14], dnc=[2, 4, 5, 6, 9, 10, 11, 13]),
+    Case(frozenset(['-------1'])),
+    Case(frozenset(['------^^'])),
+    Case(frozenset(['-----^^^'])),
+    Case(frozenset(['0^^^'])),
+    Case(frozenset(['0~~~'])),
+    Case(frozenset(['^^^^^^^^'])),
+    Case(frozenset(['^^^0', '100-'])),
+    Case(frozenset(['00^-0^^0', '01000001', '10001000'])),
+    Case(frozenset(['^^^00', '111^^'])),
+    Case(frozenset(['---00000^^^^^^^'])),
+    Case(frozenset(['-0', '0-']), ons=[0, 1, 2]),
+    Case(frozenset(['-^^1', '^^^0', '01--']), ons=[2, 4, 5, 6, 7, 8, 11, 13], dnc=[3, 14]),
+    Case(frozenset(['^^^^']), ons=[1, 2], dnc=[0, 3, 4, 6, 7, 8, 9, 11, 12, 13, 14]),
+    Case(frozenset(['~11-0~', '1-1^0^']), ons=[24, 57, 60],
+         dnc=[10, 12, 14, 16, 20, 28, 29, 31, 33, 34, 35, 39, 40, 41, 43, 44, 52, 55, 61, 63]),
+)
+
 # main function
 ###############################################################################
 def main():
-    common_test_vector = [
-        { 'res': set(['----']), 'ons': [], 'dnc': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15] },
-        { 'res': set(['----']), 'ons': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15] },
-        { 'res': set(['----']), 'ons': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], 'dnc': [10, 11, 12, 13, 14, 15] },
-        { 'res': set(['----']), 'ons': [1, 3, 5, 7, 9, 11, 13, 15], 'dnc': [0, 2, 4, 6, 8, 10, 12, 14] },
-    ]
-    noxor_test_vector = [
-        { 'res': set(['010-', '1-01', '111-', '0-11']), 'ons': [3,4,5,7,9,13,14,15] },
-    ]
-    xor_test_vector = [
-        { 'res': set(['--^^']) },
-        { 'res': set(['1--^^']) },
-        { 'res': set(['-10']), 'ons': [2], 'dnc': [4, 5, 6, 7] },
-        { 'res': set(['--1--11-', '00000001', '10001000']) },
-        { 'res': set(['--^^']), 'ons': [1, 2, 5, 6, 9, 10, 13, 14] },
-        { 'res': set(['^^^^']), 'ons': [1, 7, 8, 14], 'dnc': [2, 4, 5, 6, 9, 10, 11, 13] },
-        { 'res': set(['-------1']) },
-        { 'res': set(['------^^']) },
-        { 'res': set(['-----^^^']) },
-        { 'res': set(['0^^^']) },
-        { 'res': set(['0~~~']) },
-        { 'res': set(['^^^^^^^^']) },
-        { 'res': set(['^^^0', '100-']) },
-        { 'res': set(['00^-0^^0', '01000001', '10001000']) },
-        { 'res': set(['^^^00', '111^^']) },
-        { 'res': set(['---00000^^^^^^^']) },
-    ]
+    parser = argparse.ArgumentParser(description='Run the quine_mccluskey tests.')
+    parser.add_argument('-q', '--quiet', action='store_true',
+            help='only print the details of failing tests')
+    args = parser.parse_args()
+    verbose = not args.quiet
+
     try:
-        res = run(common_test_vector + noxor_test_vector, use_xor=False)
-        res = run(common_test_vector + xor_test_vector, use_xor=True)
+        res = run(common_test_vector + noxor_test_vector, use_xor=False, verbose=verbose)
+        res = run(common_test_vector + xor_test_vector, use_xor=True, verbose=verbose)
+        run_permutations()
+        run_reset_profile()
     except TestFailure: return 1
     return 0
 